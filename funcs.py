@@ -1,6 +1,44 @@
+import bisect
+import math
 import numpy as np
+import scipy.linalg as linalg
+import scipy.linalg.lapack as lapack
 import scipy.optimize as opt
 
+import maths_functions as mf
+
+# Models which always return a new floating point array, so their residuals can be found in place
+_IN_PLACE_MODELS = (mf.gauss, mf.lorentz, mf.sin, mf.cos_superpos, mf.cos_prod)
+
+# Analytic Jacobians of the built-in models, used when fitting them unless another is given
+_JACOBIANS = {
+    mf.gauss: mf.gauss_jac,
+    mf.lorentz: mf.lorentz_jac,
+    mf.sin: mf.sin_jac,
+    mf.cos_superpos: mf.cos_superpos_jac,
+    mf.cos_prod: mf.cos_prod_jac,
+}
+
+# Functions which broadcast over stacked coefficients, so can be evaluated for many fits in one go
+_BROADCASTS = (*_IN_PLACE_MODELS, *_JACOBIANS.values())
+
+def _jacobian(func):
+    """
+    Find the analytic Jacobian of a built-in model.
+
+    Parameters
+    ----------
+    func : callable
+        The function to be fit.
+
+    Returns
+    -------
+    callable or None
+        The Jacobian of func, or None if func is not a built-in model.
+    """
+    # Compare by identity, as func need not be hashable
+    return next((jac for model, jac in _JACOBIANS.items() if model is func), None)
+
 def residuals(p, func, x, y, s=1) -> np.ndarray:
     """
     Find the residuals from fitting data to a function.
@@ -27,9 +65,119 @@ def residuals(p, func, x, y, s=1) -> np.ndarray:
     --------
     residuals_data : Find the residuals between observed data and a model. 
     """
-    return (y - func(p, x)) / s
+    return _residuals_func(func, x, y, s)(p)
+
+def _residuals_func(func, x, y, s=1, dtype=None):
+    """
+    Make the residuals function of a fit, which only takes the coefficients, to pass straight to least_squares.
+
+    Parameters
+    ----------
+    func : callable
+        The function to be fit.
+    x : array_like
+        The x data to be fit.
+    y : array_like
+        The y data to be fit.
+    s : float or array_like, default 1
+        The standard deviation.
+    dtype : data-type, optional
+        The type the coefficients are cast to before calling func, so it is evaluated in that precision.
+
+    Returns
+    -------
+    callable
+        The residuals as a function of the coefficients.
+    """
+    y = np.asarray(y)
+
+    # Find 1/s once so each evaluation multiplies rather than divides, and skip it entirely if the fit is unweighted
+    inv_s = 1 / np.asarray(s, dtype=float if dtype is None else dtype)
+    weighted = np.any(inv_s != 1)
+
+    if func in _IN_PLACE_MODELS and np.ndim(x):
+        # Reuse the array the model was evaluated into rather than allocating more,
+        # as long as the residuals have the same shape and precision as it
+        def fresid(p):
+            r = func(p, x)
+            if np.shape(y) != r.shape or np.result_type(y, r) != r.dtype:
+                return (y - r) * inv_s if weighted else y - r
+            np.subtract(y, r, out=r)
+            if weighted:
+                r *= inv_s
+            return r
+    elif weighted:
+        def fresid(p):
+            return (y - func(p, x)) * inv_s
+    else:
+        def fresid(p):
+            return y - func(p, x)
+
+    if dtype is not None:
+        fresid_cast = fresid
+        def fresid(p):
+            return fresid_cast(np.asarray(p, dtype))
+    return fresid
+
+def _residuals_jac(func, x, s, jac_func=None, dtype=None):
+    """
+    Find the Jacobian of the residuals to pass to least_squares.
+
+    Parameters
+    ----------
+    func : callable
+        The function to be fit.
+    x : array_like
+        The x data to be fit.
+    s : float or array_like
+        The standard deviation.
+    jac_func : callable, optional
+        The Jacobian of func, called as jac_func(p, x). Defaults to the analytic Jacobian if func is a built-in model.
+    dtype : data-type, optional
+        The type the coefficients are cast to before calling jac_func, so it is evaluated in that precision.
+
+    Returns
+    -------
+    callable or str
+        The Jacobian of the residuals, or '2-point' for least_squares to estimate it by finite differences if there is no Jacobian for func.
+    """
+    if jac_func is None:
+        jac_func = _jacobian(func)
+        if jac_func is None:
+            return '2-point'
+
+    inv_s = np.reshape(-1 / np.asarray(s, dtype=float if dtype is None else dtype), (-1, 1))
+    def jac(p):
+        return jac_func(np.asarray(p, dtype), x) * inv_s
+    return jac
+
+def _inverse_hessian(jac) -> np.ndarray:
+    """
+    Find the inverse of the estimated Hessian matrix J^T J of a fit.
+
+    Parameters
+    ----------
+    jac : numpy.ndarray
+        The Jacobian of the residuals at the fitted coefficients.
+
+    Returns
+    -------
+    numpy.ndarray
+        The inverse of J^T J, only the lower triangle is guaranteed to be filled in.
+    """
+    # Cholesky factorise and invert J^T J in place with LAPACK, as it is symmetric positive definite
+    c, info = lapack.dpotrf(jac.T @ jac, lower=1, overwrite_a=1)
+    if info == 0:
+        K, info = lapack.dpotri(c, lower=1, overwrite_c=1)
+        if info == 0:
+            return K
 
-def fitting(p, x, y, func, s=1):
+    # J^T J is too badly conditioned to factorise, so invert it through a QR of J instead
+    R = np.linalg.qr(jac, mode='r')
+    R_inv = linalg.solve_triangular(R, np.eye(R.shape[0]))
+    return R_inv @ R_inv.T
+
+def fitting(p, x, y, func, s=1, cov=False, jac_func=None, dtype=np.float64, fast=False):
     """
     Fit data to a function.
     
@@ -45,6 +193,14 @@ def fitting(p, x, y, func, s=1):
         The function to fit the data to.
     s : float, default 1
         The standard deviation.
+    cov : bool, default False
+        If True also return the covariance matrix of the fitted coefficients.
+    jac_func : callable, optional
+        The Jacobian of func with respect to its coefficients, called as jac_func(p, x). Defaults to the analytic Jacobian for the functions in maths_functions, otherwise it is estimated by finite differences.
+    dtype : data-type, default numpy.float64
+        The floating point type x and y are cast to for the fit, numpy.float32 halves the memory used by the function evaluations for large datasets.
+    fast : bool, default False
+        If True fit with a plain Levenberg-Marquardt solver, which has much less overhead than scipy.optimize.least_squares for small fits. Only used if func has an analytic Jacobian and at most 10 coefficients, and least_squares is used instead if it does not converge.
 
     Returns
     -------
@@ -54,29 +210,56 @@ def fitting(p, x, y, func, s=1):
         The chi squared value of this fit.
     unc_fit : numpy.ndarray
         The array of the uncertainties in the values of p_fit.
+    K_fit : numpy.ndarray
+        The covariance matrix of p_fit, only returned if cov is True.
     
     See Also
     --------
     fitting_params_only : Fit data to a function and only return the parameters.
     """
+    x = np.ascontiguousarray(x, dtype)
+    y = np.ascontiguousarray(y, dtype)
+
+    if jac_func is None:
+        jac_func = _jacobian(func)
+    fresid = _residuals_func(func, x, y, s, dtype)
+    fjac = _residuals_jac(func, x, s, jac_func, dtype)
+
     # Fit the data and find the uncertainties
-    r = opt.least_squares(residuals, p, args=(func, x, y, s))
-    p_fit = r.x
-    hessian = np.dot(r.jac.T, r.jac) #estimate the hessian matrix
-    K_fit = np.linalg.inv(hessian) #covariance matrix
+    converged = False
+    if fast and jac_func is not None and np.size(p) <= 10:
+        # Fit as a stack of one problem, then find the residuals and Jacobian least_squares would have returned
+        s_row = np.broadcast_to(np.asarray(s, dtype=float), y.shape)[None]
+        p_fit, converged = _levenberg_marquardt(np.asarray(p, dtype)[None], y[None], s_row, _rows(func, x), _rows(jac_func, x))
+        p_fit, converged = p_fit[0], converged[0]
+        fun, jac = fresid(p_fit), fjac(p_fit)
+    if not converged:
+        # Either not asked to go fast or the fast solver failed, so use least_squares
+        r = opt.least_squares(fresid, np.asarray(p, dtype), jac=fjac)
+        p_fit, fun, jac = r.x, r.fun, r.jac
+    K_fit = _inverse_hessian(jac.astype(np.float64, copy=False)) #covariance matrix, lower triangle only
     unc_fit = np.sqrt(np.diag(K_fit)) #stdevs
     
+    # the unweighted residuals at the fitted parameters, reusing the ones from the fit
+    resid = fun.astype(np.float64, copy=False) * s
+    ssr = resid @ resid
+    dof = x.size - p_fit.size
+
     # rescale
-    beta = np.sqrt(np.sum(residuals(p_fit, func, x, y)**2) / (x.size - len(p_fit)))
+    beta = np.sqrt(ssr / dof)
     unc_fit = unc_fit * beta
-    K_fit = K_fit * beta
-    
+
     # find the chi2 score
-    chi = np.sum(residuals(p_fit, func, x, y, beta)**2) / (x.size - len(p_fit))
+    chi = ssr / (beta**2 * dof)
+
+    if cov:
+        K_fit = np.tril(K_fit) + np.tril(K_fit, -1).T #fill in the upper triangle
+        K_fit = K_fit * beta**2
+        return p_fit, chi, unc_fit, K_fit
     
     return p_fit, chi, unc_fit
 
-def fitting_params_only(p, x, y, func, s=1):
+def fitting_params_only(p, x, y, func, s=1, jac_func=None, dtype=np.float64):
     """
     Fit data to a function.
     
@@ -92,6 +275,10 @@ def fitting_params_only(p, x, y, func, s=1):
         The function to fit the data to.
     s : float, default 1
         The standard deviation.
+    jac_func : callable, optional
+        The Jacobian of func with respect to its coefficients, called as jac_func(p, x). Defaults to the analytic Jacobian for the functions in maths_functions, otherwise it is estimated by finite differences.
+    dtype : data-type, default numpy.float64
+        The floating point type x and y are cast to for the fit, numpy.float32 halves the memory used by the function evaluations for large datasets.
 
     Returns
     -------
@@ -102,12 +289,169 @@ def fitting_params_only(p, x, y, func, s=1):
     --------
     fitting : Fit data to a function and returns the chi squared value as well as the uncertainty in the fitted parameters.
     """
+    x = np.ascontiguousarray(x, dtype)
+    y = np.ascontiguousarray(y, dtype)
+
     # Fit the data and find the uncertainties
-    r = opt.least_squares(residuals, p, args=(func, x, y, s))
+    r = opt.least_squares(_residuals_func(func, x, y, s, dtype), np.asarray(p, dtype), jac=_residuals_jac(func, x, s, jac_func, dtype))
     p_fit = r.x
     
     return p_fit
 
+def _levenberg_marquardt(p, y, s, model, jac, max_iter=100, tol=1e-8):
+    """
+    Fit a stack of independent least squares problems together with the Levenberg-Marquardt algorithm.
+
+    Every problem takes its own damped Gauss-Newton step each iteration, with the linear algebra for all of them done in one batched call.
+    
+    Parameters
+    ----------
+    p : array_like
+        Initial guesses at the coefficients, one row per problem.
+    y : numpy.ndarray
+        The y data to be fit, one row per problem.
+    s : numpy.ndarray
+        The standard deviations, the same shape as y.
+    model : callable
+        Evaluates the function for a stack of coefficients, model(p) returns an array with one row per row of p.
+    jac : callable
+        Evaluates the Jacobian of the function for a stack of coefficients, jac(p) returns an array with shape (len(p), y.shape[1], p.shape[1]).
+    max_iter : int, default 100
+        The maximum number of iterations.
+    tol : float, default 1e-8
+        The relative change in the coefficients or in the sum of squared residuals at which a fit has converged.
+
+    Returns
+    -------
+    p_fit : numpy.ndarray
+        The fitted coefficients, one row per problem.
+    converged : numpy.ndarray
+        Whether each fit converged, False if it ran out of iterations or the solver failed.
+    """
+    p = np.array(p, dtype=float)
+    r = (y - model(p)) / s
+    cost = np.einsum('kn,kn->k', r, r)
+    lam = np.full(len(p), 1e-3)
+    active = np.ones(len(p), dtype=bool)
+    done = np.zeros(len(p), dtype=bool)
+    diag = np.arange(p.shape[1])
+    eps = np.finfo(float).eps
+
+    for _ in range(max_iter):
+        idx = np.flatnonzero(active)
+        J = jac(p[idx]) / s[idx, :, None]
+        g = np.einsum('knm,kn->km', J, r[idx])
+        A = J.transpose(0, 2, 1) @ J
+
+        # Solve (J^T J + lam D) step = J^T r, damping with the diagonal of J^T J
+        # floored so coefficients the function doesn't depend on at the moment are still damped
+        d = A[:, diag, diag]
+        A[:, diag, diag] = d + lam[idx, None] * np.maximum(d, eps * np.maximum(d.max(axis=1, keepdims=True), 1))
+        try:
+            step = np.linalg.solve(A, g[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            # Solve the problems one by one so only the singular ones are lost
+            step = np.full_like(g, np.nan)
+            for k in range(len(idx)):
+                try:
+                    step[k] = np.linalg.solve(A[k], g[k])
+                except np.linalg.LinAlgError:
+                    pass
+
+        # Stop fitting any problems the step could not be found for, they have not converged
+        failed = ~np.isfinite(step).all(axis=1)
+        step[failed] = 0
+
+        p_new = p[idx] + step
+        r_new = (y[idx] - model(p_new)) / s[idx]
+        cost_new = np.einsum('kn,kn->k', r_new, r_new)
+
+        # Keep the steps which reduce the sum of squares and trust the linear model more next time, damp the rest harder
+        better = (cost_new < cost[idx]) & ~failed
+        converged = better & (cost[idx] - cost_new <= tol * cost[idx])
+        converged |= (np.linalg.norm(step, axis=1) <= tol * (np.linalg.norm(p[idx], axis=1) + tol)) & ~failed
+        p[idx[better]] = p_new[better]
+        r[idx[better]] = r_new[better]
+        cost[idx[better]] = cost_new[better]
+        lam[idx] = np.where(better, lam[idx] / 10, lam[idx] * 10)
+
+        # Stop fitting the problems which have converged, failed or can no longer be improved
+        done[idx[converged]] = True
+        active[idx[converged | failed | (lam[idx] > 1e16)]] = False
+        if not active.any():
+            break
+
+    return p, done
+
+def _rows(func, x):
+    """
+    Make a function which evaluates func(p, x) for each row of p.
+
+    Parameters
+    ----------
+    func : callable
+        The function to evaluate.
+    x : array_like
+        The x data.
+
+    Returns
+    -------
+    callable
+        Takes a stack of coefficients and returns one row of func per row of coefficients.
+    """
+    # The built-in functions can do every row at once, anything else is called one row at a time
+    if func in _BROADCASTS:
+        return lambda p: mf.evaluate_batch(func, p, x)
+    return lambda p: np.stack([func(p_k, x) for p_k in p])
+
+def fitting_many(p, x, y, func, s=1, jac_func=None, max_iter=100, tol=1e-8):
+    """
+    Fit many datasets which share the same x data to a function at once.
+    
+    Parameters
+    ----------
+    p : array_like
+        Initial guesses at the values of the coefficients to be fit, one row per dataset.
+    x : array_like
+        The x data to be fit.
+    y : array_like
+        The y data to be fit, one row per dataset.
+    func : callable
+        The function to fit the data to.
+    s : float or array_like, default 1
+        The standard deviation, either shared by all of the datasets or one row per dataset.
+    jac_func : callable, optional
+        The Jacobian of func with respect to its coefficients, called as jac_func(p, x). Defaults to the analytic Jacobian for the functions in maths_functions, and must be given for any other function.
+    max_iter : int, default 100
+        The maximum number of iterations.
+    tol : float, default 1e-8
+        The relative change in the coefficients or in the sum of squared residuals at which a fit has converged.
+
+    Returns
+    -------
+    p_fit : numpy.ndarray
+        The array of the coefficients after fitting the function to each dataset, one row per dataset.
+    converged : numpy.ndarray
+        Whether the fit to each dataset converged, the rows of p_fit where this is False are the last coefficients reached.
+    
+    See Also
+    --------
+    fitting_params_only : Fit data to a function and only return the parameters.
+    """
+    if jac_func is None:
+        jac_func = _jacobian(func)
+        if jac_func is None:
+            raise ValueError("jac_func must be given to fit a function which is not in maths_functions")
+
+    p = np.atleast_2d(np.asarray(p, dtype=float))
+    x = np.asarray(x, dtype=float)
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    if len(p) != len(y):
+        raise ValueError(f"p and y must have one row per dataset, got {len(p)} rows of p for {len(y)} datasets")
+    s = np.broadcast_to(np.asarray(s, dtype=float), y.shape)
+
+    return _levenberg_marquardt(p, y, s, _rows(func, x), _rows(jac_func, x), max_iter, tol)
+
 def round_sig_fig_uncertainty(value, uncertainty):
     """
     Round to the first significant figure of the uncertainty.
@@ -130,45 +474,104 @@ def round_sig_fig_uncertainty(value, uncertainty):
     --------
     round_sig_fig : Round to a given number of significant figures.
     """
-    # check if numpy array/list or float/int
-    if isinstance(value, np.ndarray) or isinstance(value, list):
-        value_out = np.array([])
-        uncertainty_out = np.array([])
-        for i in range(len(value)):
-            # Check if some of the values are 0
-            if uncertainty[i] == 0:
-                value_out = np.append(value_out, value[i])
-                uncertainty_out = np.append(uncertainty_out, uncertainty[i])
-            # Check if the leading digit in the error is 1, and if so round to an extra significant figure
-            elif np.floor(uncertainty[i] / (10**np.floor(np.log10(uncertainty[i])))) != 1.0:
-                uncertainty_rnd = np.round(uncertainty[i], int(-(np.floor(np.log10(uncertainty[i])))))
-                value_rnd = np.round(value[i], int(-(np.floor(np.log10(uncertainty_rnd)))))
-
-                value_out = np.append(value_out, value_rnd)
-                uncertainty_out = np.append(uncertainty_out, uncertainty_rnd)
-            else:
-                uncertainty_rnd = np.round(uncertainty[i], int(1 - (np.floor(np.log10(uncertainty[i])))))
-                value_rnd = np.round(value[i], int(1 - (np.floor(np.log10(uncertainty_rnd)))))
-
-                value_out = np.append(value_out, value_rnd)
-                uncertainty_out = np.append(uncertainty_out, uncertainty_rnd)
-        return value_out, uncertainty_out
-   
-    elif isinstance(value, float) or isinstance(value, int):
-        if uncertainty == 0:
+    # Single Python numbers go through math, which is much faster than numpy for one value
+    if isinstance(value, (float, int)) and isinstance(uncertainty, (float, int)):
+        if uncertainty == 0 or not math.isfinite(uncertainty):
             return value, uncertainty
-        elif np.floor(uncertainty / (10**np.floor(np.log10(uncertainty)))) != 1.0:
-            uncertainty_out = np.round(uncertainty, int(-(np.floor(np.log10(uncertainty)))))
-            value_out = np.round(value, int(-(np.floor(np.log10(uncertainty_out)))))
+        # log10 only needs to be found once
+        e = math.floor(math.log10(abs(uncertainty)))
 
-            return value_out, uncertainty_out
-        else:
-            uncertainty_out = np.round(uncertainty, int(1 - (np.floor(np.log10(uncertainty)))))
-            value_out = np.round(value, int(1 - (np.floor(np.log10(uncertainty_out)))))
+        # Check if the leading digit in the error is 1, and if so round to an extra significant figure
+        extra = math.floor(abs(uncertainty) / 10**e) == 1
+        d = extra - e
+        uncertainty_out = _round_scalar(uncertainty, d)
 
-            return value_out, uncertainty_out
-    else:
-        return value, uncertainty
+        # Round the value to one less decimal place if rounding carried the uncertainty up a digit (e.g. 0.96 -> 1.0)
+        if abs(uncertainty_out) >= 10**(e + 1):
+            d -= 1
+        return _round_scalar(value, d), uncertainty_out
+
+    # Anything else is rounded as an array of any shape, unwrapping 0-d results to scalars
+    value_out, uncertainty_out = _round_uncertainty_vec(value, uncertainty)
+    return value_out[()], uncertainty_out[()]
+
+def _round_vec(x, decimals) -> np.ndarray:
+    """
+    Round each element of an array to its own number of decimals.
+
+    Parameters
+    ----------
+    x : array_like
+        The value(s) to be rounded.
+    decimals : array_like of int
+        The number of decimal places to round each value to, negative values round to the left of the decimal point.
+
+    Returns
+    -------
+    numpy.ndarray
+        The rounded value(s).
+    """
+    # np.round only takes a single number of decimals, so scale each element the same way it does
+    scale = 10.0**np.abs(decimals)
+    return np.where(decimals >= 0, np.round(x * scale) / scale, np.round(x / scale) * scale)
+
+def _round_scalar(x, decimals) -> float:
+    """
+    Round a single number to a number of decimals the same way as _round_vec.
+
+    Parameters
+    ----------
+    x : float
+        The value to be rounded.
+    decimals : int
+        The number of decimal places to round to, negative values round to the left of the decimal point.
+
+    Returns
+    -------
+    float
+        The rounded value.
+    """
+    # Python's round(x, decimals) rounds the exact binary value, which can differ from scaling first as numpy does
+    if decimals >= 0:
+        return round(x * 10.0**decimals) / 10.0**decimals
+    return round(x / 10.0**-decimals) * 10.0**-decimals
+
+def _round_uncertainty_vec(value, uncertainty):
+    """
+    Round to the first significant figure of the uncertainty for a whole array at once.
+
+    Parameters
+    ----------
+    value : float or array_like
+        The value(s) to be rounded.
+    uncertainty : float or array_like
+        The uncertaint(y/ies) in this value, must be the same size as value.
+
+    Returns
+    -------
+    value_out : numpy.ndarray
+        The rounded array of values.
+    uncertainty_out : numpy.ndarray
+        The rounded array of uncertainties.
+    """
+    v = np.asarray(value, dtype=float)
+    u = np.asarray(uncertainty, dtype=float)
+
+    # Leave the values with an uncertainty of 0, inf or nan as they are
+    nz = np.isfinite(u) & (u != 0)
+    u_abs = np.where(nz, np.abs(u), 1)
+    e = np.floor(np.log10(u_abs))
+
+    # Check if the leading digit in the error is 1, and if so round to an extra significant figure
+    extra = np.floor(u_abs / 10**e) == 1
+    decimals = extra.astype(int) - e.astype(int)
+    u_rnd = _round_vec(u, decimals)
+
+    # Round the value to the rounded uncertainty, which has one less decimal place if rounding carried it up a digit (e.g. 0.96 -> 1.0)
+    decimals = decimals - (np.abs(u_rnd) >= 10**(e + 1))
+    v_rnd = _round_vec(v, decimals)
+
+    return np.where(nz, v_rnd, v), np.where(nz, u_rnd, u)
 
 def find_nearest_index(value, array):
     """
@@ -176,17 +579,34 @@ def find_nearest_index(value, array):
     
     Parameters
     ----------
-    value : float
-        The value to search for.
+    value : float or array_like
+        The value(s) to search for.
     array : array_like
-        The array to search.
+        The array to search, sorted in ascending order, must not be empty.
         
     Returns
     -------
-    index : int
-        The index of the closest value in the array to value.
+    index : int or numpy.ndarray
+        The index of the closest value in the array to value, the lower index is returned if value is exactly between two values.
     """
-    index = np.searchsorted(array, value, side="left")
+    if len(array) == 0:
+        raise ValueError("cannot find the nearest index in an empty array")
+
+    # Binary search without going through numpy for a single value
+    if np.isscalar(value):
+        i = bisect.bisect_left(array, value)
+        if i == 0 or (i < len(array) and array[i] - value < value - array[i-1]):
+            return i
+        return i - 1
+
+    # With one element every value is closest to it
+    if len(array) == 1:
+        return np.zeros(np.shape(value), dtype=np.intp)
+
+    # Find where the values would be inserted, then pick whichever neighbour is closer
+    array = np.asarray(array)
+    index = np.clip(np.searchsorted(array, value, side="left"), 1, len(array) - 1)
+    index -= value - array[index - 1] <= array[index] - value
     return index
 
 def residuals_data(observed, expected, s=1) -> np.ndarray:
@@ -249,12 +669,8 @@ def search_store(file: np.lib.npyio.NpzFile, string: str) -> np.ndarray:
     arr : numpy array
         The files containing the string.
     """
-    lst = []
-    for i in file:
-        if string in i:
-            lst.append(file[i])
-    arr = np.asarray([lst])
-    return arr[0]
+    arr = np.asarray([file[name] for name in file.files if string in name])
+    return arr
 
 def round_sig_fig(value, n: int) -> float:
     """
@@ -269,34 +685,20 @@ def round_sig_fig(value, n: int) -> float:
     
     Returns
     -------
-    out : float
+    out : float or numpy.ndarray
         The rounded value(s).
 
     See Also
     --------
     round_sig_fig_uncertainty : Round to the first significant figure of the uncertainty.
     """
-    # Check if float/int or array/list
-    if isinstance(value, float) or isinstance(value, int):
-        # Turn the value into a string in scientific notation
-        val_str = np.format_float_scientific(value, n)
-
-        # Split this into the base and exponent of 10, drop the base
-        expo = int(val_str.split('e')[1])
-
-        # Round the value to this number of decimal places (minus means it goes to the left of the decimal point, also add 1 because numpy is weird in the way it rounds for some reason, it tends to round to n+1 sig fig in format_float_scientific, and in round (at least when going negative for round). Not sure why, but this corrects for it)
-        out = np.round(value, -(expo - n + 1))
-        return out
-    elif isinstance(value, np.ndarray) or isinstance(value, list):
-        out = np.array([])
-        for i in range(len(value)):
-            # Turn the value into a string in scientific notation
-            val_str = np.format_float_scientific(value[i], n)
-
-            # Split this into the base and exponent of 10, drop the base
-            expo = int(val_str.split('e')[1])
-
-            # Round the value to this number of decimal places
-            out_val = np.round(value[i], -(expo - n + 1))
-            out = np.append(out, out_val)
-        return out
\ No newline at end of file
+    v = np.asarray(value, dtype=float)
+
+    # Find the exponent of 10 of each value, leaving 0 (and inf/nan) with an exponent of 0
+    with np.errstate(divide='ignore'):
+        e = np.floor(np.log10(np.abs(v)))
+    e = np.where(np.isfinite(e), e, 0)
+
+    # Round the value to this number of decimal places (minus means it goes to the left of the decimal point)
+    out = _round_vec(v, (n - 1 - e).astype(int))
+    return out[()]
\ No newline at end of file
@@ -1,5 +1,47 @@
 import numpy as np
 
+def _model_out(p, x):
+    """
+    Allocate the array a function is evaluated into, so each step can be done in place in it rather than allocating a temporary.
+
+    Parameters
+    ----------
+    p : array_like
+        Coefficients of the function.
+    x : array_like
+        The x range over which the function is to be produced.
+
+    Returns
+    -------
+    x : numpy.ndarray
+        x as an array.
+    out : numpy.ndarray
+        An empty array with the broadcast shape and the (at least floating point) result type of x and the coefficients.
+    """
+    x = np.asarray(x)
+    return x, np.empty(np.broadcast(x, *p).shape, dtype=np.result_type(x, *p, 1.0))
+
+def evaluate_batch(func, p, x):
+    """
+    Evaluate a function for a stack of coefficients at once.
+    
+    Parameters
+    ----------
+    func : callable
+        The function to evaluate, one of the functions here or any other which broadcasts over its coefficients.
+    p : array_like
+        Coefficients of the function, one row per set of coefficients.
+    x : array_like
+        The x range over which the function is to be produced.
+
+    Returns
+    -------
+    numpy.ndarray
+        The function, one row per row of p.
+    """
+    # Each coefficient becomes a column, which broadcasts against x to give a row per set of coefficients
+    return func(np.asarray(p).T[..., None], x)
+
 def gauss(p, x):
     """
     Produce a Gaussian function.
@@ -16,7 +58,14 @@ def gauss(p, x):
     numpy.ndarray
         The Gaussian function.
     """
-    return p[0] * np.exp(-(x - p[1])**2 / (2 * p[2]**2)) + p[3]
+    x, out = _model_out(p, x)
+    np.subtract(x, p[1], out=out)
+    np.square(out, out=out)
+    out *= np.divide(-1, 2 * np.square(p[2]))
+    np.exp(out, out=out)
+    out *= p[0]
+    out += p[3]
+    return out[()]
 
 def lorentz(p, x):
     """
@@ -34,7 +83,13 @@ def lorentz(p, x):
     numpy.ndarray
         The Lorentzian function.
     """
-    return p[0] * p[2]**2 / ((x - p[1])**2 + p[2]**2) + p[3]
+    x, out = _model_out(p, x)
+    np.subtract(x, p[1], out=out)
+    np.square(out, out=out)
+    out += p[2]**2
+    np.divide(p[0] * p[2]**2, out, out=out)
+    out += p[3]
+    return out[()]
 
 def sin(p, x):
     """
@@ -52,7 +107,13 @@ def sin(p, x):
     numpy.ndarray
         The sin function.
     """
-    return p[0]*np.sin(p[1]*x+p[2]) + p[3]
+    x, out = _model_out(p, x)
+    np.multiply(x, p[1], out=out)
+    out += p[2]
+    np.sin(out, out=out)
+    out *= p[0]
+    out += p[3]
+    return out[()]
 
 def cos_superpos(p, x):
     """
@@ -70,7 +131,18 @@ def cos_superpos(p, x):
     numpy.ndarray
         The function.
     """
-    return p[0]*(np.cos(p[1]*x+p[2]) + np.cos(p[3]*x+p[4])) + p[5]
+    x, out = _model_out(p, x)
+    tmp = np.empty_like(out)
+    np.multiply(x, p[1], out=out)
+    out += p[2]
+    np.cos(out, out=out)
+    np.multiply(x, p[3], out=tmp)
+    tmp += p[4]
+    np.cos(tmp, out=tmp)
+    out += tmp
+    out *= p[0]
+    out += p[5]
+    return out[()]
 
 def cos_prod(p, x):
     """
@@ -88,4 +160,142 @@ def cos_prod(p, x):
     numpy.ndarray
         The function.
     """
-    return p[0]*np.cos(p[1]*x+p[2]) * np.cos(p[3]*x+p[4]) + p[5]
\ No newline at end of file
+    x, out = _model_out(p, x)
+    tmp = np.empty_like(out)
+    np.multiply(x, p[1], out=out)
+    out += p[2]
+    np.cos(out, out=out)
+    np.multiply(x, p[3], out=tmp)
+    tmp += p[4]
+    np.cos(tmp, out=tmp)
+    out *= tmp
+    out *= p[0]
+    out += p[5]
+    return out[()]
+
+def gauss_jac(p, x):
+    """
+    Produce the Jacobian of the Gaussian function.
+    
+    Parameters
+    ----------
+    p : array_like
+        Coefficients of the function.
+    x : array_like
+        The x range over which the Jacobian is to be produced.
+
+    Returns
+    -------
+    numpy.ndarray
+        The derivatives of the function with respect to each coefficient, along the last axis.
+
+    See Also
+    --------
+    gauss : Produce a Gaussian function.
+    """
+    z = (x - p[1]) / p[2]
+    e = np.exp(-0.5 * z * z)
+    return np.stack(np.broadcast_arrays(e, p[0] * e * z / p[2], p[0] * e * z * z / p[2], np.ones_like(e)), axis=-1)
+
+def lorentz_jac(p, x):
+    """
+    Produce the Jacobian of the Lorentzian function.
+    
+    Parameters
+    ----------
+    p : array_like
+        Coefficients of the function.
+    x : array_like
+        The x range over which the Jacobian is to be produced.
+
+    Returns
+    -------
+    numpy.ndarray
+        The derivatives of the function with respect to each coefficient, along the last axis.
+
+    See Also
+    --------
+    lorentz : Produce a Lorentzian function.
+    """
+    d = x - p[1]
+    denom = d * d + p[2]**2
+    l = p[2]**2 / denom
+    return np.stack(np.broadcast_arrays(l, 2 * p[0] * l * d / denom, 2 * p[0] * l * d * d / (p[2] * denom), np.ones_like(l)), axis=-1)
+
+def sin_jac(p, x):
+    """
+    Produce the Jacobian of the sin function.
+    
+    Parameters
+    ----------
+    p : array_like
+        Coefficients of the function.
+    x : array_like
+        The x range over which the Jacobian is to be produced.
+
+    Returns
+    -------
+    numpy.ndarray
+        The derivatives of the function with respect to each coefficient, along the last axis.
+
+    See Also
+    --------
+    sin : Produce a sin function.
+    """
+    theta = p[1]*x+p[2]
+    c = p[0] * np.cos(theta)
+    return np.stack(np.broadcast_arrays(np.sin(theta), c * x, c, np.ones_like(c)), axis=-1)
+
+def cos_superpos_jac(p, x):
+    """
+    Produce the Jacobian of the sum of two cos functions.
+    
+    Parameters
+    ----------
+    p : array_like
+        Coefficients of the function.
+    x : array_like
+        The x range over which the Jacobian is to be produced.
+
+    Returns
+    -------
+    numpy.ndarray
+        The derivatives of the function with respect to each coefficient, along the last axis.
+
+    See Also
+    --------
+    cos_superpos : Produce a function that is the sum of two cos functions.
+    """
+    theta_1 = p[1]*x+p[2]
+    theta_2 = p[3]*x+p[4]
+    s_1 = -p[0] * np.sin(theta_1)
+    s_2 = -p[0] * np.sin(theta_2)
+    return np.stack(np.broadcast_arrays(np.cos(theta_1) + np.cos(theta_2), s_1 * x, s_1, s_2 * x, s_2, np.ones_like(s_1)), axis=-1)
+
+def cos_prod_jac(p, x):
+    """
+    Produce the Jacobian of the product of two cos functions.
+    
+    Parameters
+    ----------
+    p : array_like
+        Coefficients of the function.
+    x : array_like
+        The x range over which the Jacobian is to be produced.
+
+    Returns
+    -------
+    numpy.ndarray
+        The derivatives of the function with respect to each coefficient, along the last axis.
+
+    See Also
+    --------
+    cos_prod : Produce a function that is the product of two cos functions.
+    """
+    theta_1 = p[1]*x+p[2]
+    theta_2 = p[3]*x+p[4]
+    c_1 = np.cos(theta_1)
+    c_2 = np.cos(theta_2)
+    d_1 = -p[0] * np.sin(theta_1) * c_2
+    d_2 = -p[0] * c_1 * np.sin(theta_2)
+    return np.stack(np.broadcast_arrays(c_1 * c_2, d_1 * x, d_1, d_2 * x, d_2, np.ones_like(d_1)), axis=-1)
\ No newline at end of file